@@ -0,0 +1,29 @@
+"""Add HNSW index on chunks.embedding
+
+Revision ID: a1f3c9d2b4e5
+Revises:
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a1f3c9d2b4e5"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "chunks_embedding_hnsw_idx",
+        "chunks",
+        ["embedding"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("chunks_embedding_hnsw_idx", table_name="chunks")
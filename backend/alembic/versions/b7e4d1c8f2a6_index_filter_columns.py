@@ -0,0 +1,28 @@
+"""Index the user_id/doc_id filter columns
+
+Revision ID: b7e4d1c8f2a6
+Revises: a1f3c9d2b4e5
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e4d1c8f2a6"
+down_revision = "a1f3c9d2b4e5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_documents_user_id", "documents", ["user_id"])
+    op.create_index("ix_chunks_doc_id", "chunks", ["doc_id"])
+    op.create_index("ix_chunks_user_id", "chunks", ["user_id"])
+    op.create_index("ix_chunks_user_doc", "chunks", ["user_id", "doc_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chunks_user_doc", table_name="chunks")
+    op.drop_index("ix_chunks_user_id", table_name="chunks")
+    op.drop_index("ix_chunks_doc_id", table_name="chunks")
+    op.drop_index("ix_documents_user_id", table_name="documents")
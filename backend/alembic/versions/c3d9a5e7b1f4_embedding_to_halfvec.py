@@ -0,0 +1,40 @@
+"""Store embeddings as halfvec (FP16)
+
+Revision ID: c3d9a5e7b1f4
+Revises: b7e4d1c8f2a6
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3d9a5e7b1f4"
+down_revision = "b7e4d1c8f2a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("chunks_embedding_hnsw_idx", table_name="chunks")
+    op.execute("ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(4) USING embedding::halfvec(4)")
+    op.create_index(
+        "chunks_embedding_hnsw_idx",
+        "chunks",
+        ["embedding"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "halfvec_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("chunks_embedding_hnsw_idx", table_name="chunks")
+    op.execute("ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(4) USING embedding::vector(4)")
+    op.create_index(
+        "chunks_embedding_hnsw_idx",
+        "chunks",
+        ["embedding"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
@@ -0,0 +1,28 @@
+"""Generate primary-key UUIDs in Postgres
+
+Revision ID: d8b2f6c4a9e1
+Revises: c3d9a5e7b1f4
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d8b2f6c4a9e1"
+down_revision = "c3d9a5e7b1f4"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("users", "documents", "chunks")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    for table in _TABLES:
+        op.alter_column(table, "id", server_default=sa.text("gen_random_uuid()"))
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.alter_column(table, "id", server_default=None)
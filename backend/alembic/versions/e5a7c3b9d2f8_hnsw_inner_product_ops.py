@@ -0,0 +1,38 @@
+"""Rank embeddings by inner product
+
+Revision ID: e5a7c3b9d2f8
+Revises: d8b2f6c4a9e1
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a7c3b9d2f8"
+down_revision = "d8b2f6c4a9e1"
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(ops: str) -> None:
+    op.drop_index("chunks_embedding_hnsw_idx", table_name="chunks")
+    op.create_index(
+        "chunks_embedding_hnsw_idx",
+        "chunks",
+        ["embedding"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": ops},
+    )
+
+
+def upgrade() -> None:
+    # Embeddings are L2-normalized at write time from this revision on, so
+    # inner product ranks identically to cosine. Pre-existing rows were
+    # written by the mock pipeline and are renormalized in place.
+    op.execute("UPDATE chunks SET embedding = l2_normalize(embedding) WHERE embedding IS NOT NULL")
+    _rebuild("halfvec_ip_ops")
+
+
+def downgrade() -> None:
+    _rebuild("halfvec_cosine_ops")
@@ -0,0 +1,33 @@
+"""Add a tsvector column for keyword search over chunks
+
+Revision ID: f2c8e4a6b3d7
+Revises: e5a7c3b9d2f8
+Create Date: 2026-09-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic.
+revision = "f2c8e4a6b3d7"
+down_revision = "e5a7c3b9d2f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chunks", sa.Column("text_search", TSVECTOR))
+    op.execute(
+        "CREATE TRIGGER chunks_text_search_update BEFORE INSERT OR UPDATE ON chunks "
+        "FOR EACH ROW EXECUTE FUNCTION "
+        "tsvector_update_trigger(text_search, 'pg_catalog.english', text_chunk)"
+    )
+    op.execute("UPDATE chunks SET text_search = to_tsvector('pg_catalog.english', coalesce(text_chunk, ''))")
+    op.create_index("chunks_text_search_gin_idx", "chunks", ["text_search"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("chunks_text_search_gin_idx", table_name="chunks")
+    op.execute("DROP TRIGGER chunks_text_search_update ON chunks")
+    op.drop_column("chunks", "text_search")
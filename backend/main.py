@@ -1,12 +1,23 @@
+import asyncio
+import concurrent.futures
 import os
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.orm import selectinload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import date
 from dotenv import load_dotenv
+import numpy as np
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import TypeAdapter
+from anyio import to_thread
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,12 +25,15 @@ load_dotenv()
 import auth
 import models
 import schemas
-from database import SessionLocal, engine, get_db
+import database
+from database import get_db, get_session_factory
 
 # This line is commented out for production deployment
-# models.Base.metadata.create_all(bind=engine)
+# models.Base.metadata.create_all(bind=database.get_engine())
 
-app = FastAPI(title="Contract AI API", version="1.0")
+# orjson serializes UUIDs, dates and nested lists in C, which is
+# noticeably faster than the stdlib json module on the chunk-heavy responses.
+app = FastAPI(title="Contract AI API", version="1.0", default_response_class=ORJSONResponse)
 
 # --- CORS Middleware ---
 # This allows your frontend to communicate with your backend
@@ -34,140 +48,264 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def on_startup():
+    FastAPICache.init(InMemoryBackend())
+    # Match the threadpool (used for bcrypt and any remaining sync work) to
+    # this worker's DB pool size configured in database.py.
+    to_thread.current_default_thread_limiter().total_tokens = database.POOL_SIZE
+
+# Mock insights returned with every contract detail; static, so built once.
+_INSIGHTS_CONST = (
+    {"id": 1, "type": "risk", "text": "Termination notice period is longer than standard."},
+    {"id": 2, "type": "recommendation", "text": "Consider negotiating a liability cap based on annual fees."},
+)
+
+# bcrypt hashing is 50-200ms of pure CPU; a process pool keeps signup
+# bursts off this worker's GIL entirely.
+_HASH_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Built once at import; constructing a TypeAdapter per request dominates
+# small-payload responses.
+_CHUNK_LIST_ADAPTER = TypeAdapter(List[schemas.Chunk])
+
+# Hybrid retrieval for /ask: top-20 by inner product, top-20 by ts_rank,
+# merged with a weighted sum. One statement, two indexes (HNSW + GIN),
+# no extra service.
+_HYBRID_SEARCH_SQL = text("""
+WITH vector_hits AS (
+    SELECT id, -(embedding <#> CAST(:query_embedding AS halfvec(4))) AS vector_score
+    FROM chunks
+    WHERE user_id = :user_id
+    ORDER BY embedding <#> CAST(:query_embedding AS halfvec(4))
+    LIMIT 20
+),
+keyword_hits AS (
+    SELECT id, ts_rank(text_search, plainto_tsquery('english', :question)) AS keyword_score
+    FROM chunks
+    WHERE user_id = :user_id AND text_search @@ plainto_tsquery('english', :question)
+    ORDER BY keyword_score DESC
+    LIMIT 20
+),
+ranked AS (
+    SELECT COALESCE(v.id, k.id) AS id,
+           COALESCE(v.vector_score, 0) * 0.7 + COALESCE(k.keyword_score, 0) * 0.3 AS score
+    FROM vector_hits v FULL OUTER JOIN keyword_hits k ON v.id = k.id
+)
+SELECT c.* FROM chunks c JOIN ranked ON ranked.id = c.id
+ORDER BY ranked.score DESC
+LIMIT 5
+""")
+
+def _contracts_key(func, namespace, *, request, response, args, kwargs):
+    # Cache per user, not per URL: the list is private to its owner.
+    return f"{namespace}:{kwargs['current_user'].id}"
+
+def _contract_detail_key(func, namespace, *, request, response, args, kwargs):
+    # Keyed per (owner, document); shares the contracts namespace so upload
+    # invalidation clears details together with the list.
+    return f"{namespace}:{kwargs['current_user'].id}:{kwargs['doc_id']}"
+
 # --- API Endpoints ---
 
 @app.post("/signup", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.User).filter(models.User.username == user.username))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    
-    hashed_password = auth.get_password_hash(user.password)
-    new_user = models.User(id=uuid4(), username=user.username, hashed_password=hashed_password)
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+
+    hashed_password = await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, auth.get_password_hash, user.password
+    )
+    # INSERT ... RETURNING hydrates the server-generated id in the same
+    # round-trip, so no refresh SELECT is needed.
+    result = await db.execute(
+        insert(models.User)
+        .values(username=user.username, hashed_password=hashed_password)
+        .returning(models.User)
+    )
+    new_user = result.scalar_one()
+    await db.commit()
     return new_user
 
 @app.post("/login", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = auth.authenticate_user(db, username=form_data.username, password=form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await auth.authenticate_user(db, username=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = auth.create_access_token(data={"sub": user.username})
+    access_token = auth.create_access_token(data={"sub": str(user.id), "username": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.post("/upload")
+def _normalize(embedding) -> np.ndarray:
+    # All embeddings are unit-norm (see models.Chunk), which lets /ask rank
+    # by plain inner product instead of cosine distance.
+    v = np.asarray(embedding, dtype=np.float32)
+    return v / (np.linalg.norm(v) + 1e-12)
+
+# Static halves of the mock LlamaCloud chunks, built once at import.
+# Embeddings are already unit-norm float16 (see models.Chunk), so per-upload
+# work is limited to filling in the dynamic fields.
+_MOCK_CHUNK_TEMPLATES = (
+    {
+        "text": "Termination clause: Either party may terminate with 90 days’ notice.",
+        "embedding": _normalize((0.12, -0.45, 0.91, 0.33)).astype(np.float16),
+        "meta_title": "Termination",
+        "page": 2,
+    },
+    {
+        "text": "Liability cap: Limited to 12 months’ fees.",
+        "embedding": _normalize((0.01, 0.22, -0.87, 0.44)).astype(np.float16),
+        "meta_title": "Liability",
+        "page": 5,
+    },
+)
+
+async def _process_document(doc_id: UUID, user_id: UUID, filename: str):
+    # Runs after the 202 response; uses its own session since the request's
+    # is closed by then. Mock LlamaCloud parsing — a real implementation
+    # would consume the parser's output here.
+    # One executemany-style INSERT for all chunks, committed together with
+    # the status flip: two round-trips total instead of one per chunk.
+    chunk_rows = [
+        {
+            "doc_id": doc_id,
+            "user_id": user_id,
+            "text_chunk": template["text"],
+            "embedding": template["embedding"],
+            "chunk_metadata": {
+                "page": template["page"],
+                "contract_name": filename,
+                "clause_title": template["meta_title"],
+            },
+        }
+        for template in _MOCK_CHUNK_TEMPLATES
+    ]
+    async with get_session_factory()() as db:
+        await db.execute(insert(models.Chunk), chunk_rows)
+        await db.execute(
+            update(models.Document).where(models.Document.id == doc_id).values(status="Active")
+        )
+        await db.commit()
+
+    # Document finished processing: drop cached contract lists so readers see it.
+    await FastAPICache.clear(namespace="contracts")
+
+@app.post("/upload", status_code=202)
 async def upload_contract(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     parties: str = Form(...),
     expiry_date: date = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    # Mock LlamaCloud parsing
-    # In a real app, you would send the file content to a parsing service
-    # Here, we just create mock chunks.
-    
-    # 1. Create and save the document metadata
-    new_doc = models.Document(
-        id=uuid4(),
-        user_id=current_user.id,
-        filename=file.filename,
-        parties=parties,
-        expiry_date=expiry_date,
-        status="Active", # Mock status
-        risk_score="Low" # Mock risk score
-    )
-    db.add(new_doc)
-    db.commit()
-    db.refresh(new_doc)
-
-    # 2. Mock LlamaCloud response and save chunks
-    mock_llama_response = {
-        "document_id": str(new_doc.id),
-        "chunks": [
-            {
-                "chunk_id": "c1",
-                "text": f"Termination clause for {file.filename}: Either party may terminate with 90 days’ notice.",
-                "embedding": [0.12, -0.45, 0.91, 0.33],
-                "metadata": { "page": 2, "contract_name": file.filename, "clause_title": "Termination" }
-            },
-            {
-                "chunk_id": "c2",
-                "text": f"Liability cap from {file.filename}: Limited to 12 months’ fees.",
-                "embedding": [0.01, 0.22, -0.87, 0.44],
-                "metadata": { "page": 5, "contract_name": file.filename, "clause_title": "Liability" }
-            }
-        ]
-    }
-
-    for chunk_data in mock_llama_response["chunks"]:
-        new_chunk = models.Chunk(
-            id=uuid4(),
-            doc_id=new_doc.id,
+    # 1. Persist the document metadata first so the client immediately gets
+    # an id it can poll; parsing happens off the request's critical path.
+    # INSERT ... RETURNING collects the server-generated id without a
+    # follow-up refresh SELECT.
+    result = await db.execute(
+        insert(models.Document)
+        .values(
             user_id=current_user.id,
-            text_chunk=chunk_data["text"],
-            embedding=chunk_data["embedding"],
-            chunk_metadata=chunk_data["metadata"]
+            filename=file.filename,
+            parties=parties,
+            expiry_date=expiry_date,
+            status="Processing",
+            risk_score="Low",  # Mock risk score
         )
-        db.add(new_chunk)
-    
-    db.commit()
+        .returning(models.Document)
+    )
+    new_doc = result.scalar_one()
+    await db.commit()
+
+    # 2. Parse and store chunks in the background, after the response.
+    background_tasks.add_task(_process_document, new_doc.id, current_user.id, file.filename)
 
-    return {"filename": file.filename, "doc_id": new_doc.id, "status": "processed"}
+    return {"filename": file.filename, "doc_id": new_doc.id, "status": "Processing"}
 
 @app.get("/contracts", response_model=List[schemas.Document])
-def get_contracts(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    contracts = db.query(models.Document).filter(models.Document.user_id == current_user.id).all()
-    return contracts
+@cache(expire=30, namespace="contracts", key_builder=_contracts_key)
+async def get_contracts(request: Request, response: Response, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+    # Select only the columns the response model needs and skip ORM
+    # hydration entirely; Pydantic validates the row mappings directly.
+    result = await db.execute(
+        select(
+            models.Document.id,
+            models.Document.filename,
+            models.Document.uploaded_on,
+            models.Document.expiry_date,
+            models.Document.status,
+            models.Document.risk_score,
+            models.Document.parties,
+        ).where(models.Document.user_id == current_user.id)
+    )
+    return [dict(row) for row in result.mappings()]
 
 @app.get("/contracts/{doc_id}", response_model=schemas.DocumentDetail)
-def get_contract_details(doc_id: UUID, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    document = db.query(models.Document).filter(models.Document.id == doc_id, models.Document.user_id == current_user.id).first()
+@cache(expire=30, namespace="contracts", key_builder=_contract_detail_key)
+async def get_contract_details(doc_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+    # Eager-load the chunks with the document in one planned query;
+    # raiseload guards against accidental lazy loads creeping back in.
+    result = await db.execute(
+        select(models.Document)
+        .options(selectinload(models.Document.chunks), raiseload("*"))
+        .filter(models.Document.id == doc_id, models.Document.user_id == current_user.id)
+    )
+    document = result.scalars().first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    chunks = db.query(models.Chunk).filter(models.Chunk.doc_id == doc_id).all()
-    
-    # Mock insights
-    mock_insights = [
-        {"id": 1, "type": "risk", "text": "Termination notice period is longer than standard."},
-        {"id": 2, "type": "recommendation", "text": "Consider negotiating a liability cap based on annual fees."}
-    ]
 
-    return {
+    chunks = document.chunks
+
+    # Build a typed DocumentDetail so orjson walks one validated structure
+    # instead of an ad-hoc dict.
+    return schemas.DocumentDetail.model_validate({
         "id": document.id,
         "filename": document.filename,
+        "uploaded_on": document.uploaded_on,
         "parties": document.parties,
         "expiry_date": document.expiry_date,
         "status": document.status,
         "risk_score": document.risk_score,
         "clauses": chunks,
-        "insights": mock_insights
-    }
+        "insights": _INSIGHTS_CONST
+    })
 
 @app.post("/ask")
-def ask_question(question: schemas.Question, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+async def ask_question(question: schemas.Question, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
     # Mock RAG workflow
     # 1. Embed the user's question (mocked)
     mock_query_embedding = [0.1, 0.2, 0.3, 0.4]
 
-    # 2. Perform vector search in Postgres (mocked)
-    # In a real app, you would use a SQL query with pgvector's cosine distance/similarity operator
-    # e.g., SELECT *, 1 - (embedding <=> '[0.1,0.2,...]') AS similarity FROM chunks WHERE user_id = ... ORDER BY similarity DESC LIMIT 5
-    retrieved_chunks = db.query(models.Chunk).filter(models.Chunk.user_id == current_user.id).limit(2).all()
+    # 2. Hybrid search: the vector leg orders by <#> (negative inner
+    # product over unit-norm embeddings, so it ranks like cosine at half
+    # the arithmetic, and the bare operator keeps the HNSW index usable);
+    # the keyword leg ranks by ts_rank over the GIN-indexed tsvector.
+    await db.execute(text("SET LOCAL hnsw.ef_search = 40"))
+    query_embedding = _normalize(mock_query_embedding)
+    result = await db.execute(
+        select(models.Chunk)
+        .from_statement(_HYBRID_SEARCH_SQL)
+        .params(
+            query_embedding="[" + ",".join(map(str, query_embedding)) + "]",
+            question=question.question,
+            user_id=current_user.id,
+        )
+    )
+    retrieved_chunks = _CHUNK_LIST_ADAPTER.validate_python(
+        result.scalars().all(), from_attributes=True
+    )
     
     # 3. Generate a mock answer
     mock_answer = f"Based on the retrieved documents, the answer to '{question.question}' relates to termination and liability clauses. Please review the provided snippets for details."
 
     return {
         "answer": mock_answer,
-        "retrieved_chunks": retrieved_chunks
+        "retrieved_chunks": _CHUNK_LIST_ADAPTER.dump_python(retrieved_chunks, mode="json")
     }
 
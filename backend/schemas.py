@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from datetime import date
@@ -21,8 +21,7 @@ class UserCreate(UserBase):
 class User(UserBase):
     id: UUID
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # --- Chunk Schemas ---
 class ChunkBase(BaseModel):
@@ -33,8 +32,7 @@ class Chunk(ChunkBase):
     id: UUID
     doc_id: UUID
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # --- Document Schemas ---
 class DocumentBase(BaseModel):
@@ -48,8 +46,7 @@ class Document(DocumentBase):
     id: UUID
     uploaded_on: date
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 class DocumentDetail(Document):
     clauses: List[Chunk] = []
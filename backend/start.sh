@@ -0,0 +1,16 @@
+#!/bin/sh
+# Production entrypoint: one worker per core, uvloop event loop and the
+# httptools HTTP parser (both ship with uvicorn[standard]). Each worker
+# builds its own DB engine lazily (see database.py), so pools are never
+# shared across processes, and database.py reads WEB_CONCURRENCY to split
+# the connection budget so the total stays under Postgres's max_connections.
+cd "$(dirname "$0")" || exit 1
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-$(nproc)}"
+export WEB_CONCURRENCY
+exec uvicorn main:app \
+    --host 0.0.0.0 \
+    --port "${PORT:-8000}" \
+    --workers "$WEB_CONCURRENCY" \
+    --loop uvloop \
+    --http httptools \
+    --log-level warning